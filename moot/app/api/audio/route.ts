@@ -0,0 +1,67 @@
+/**
+ * Audio API Route
+ *
+ * Binary sidechannel for TTS audio. The chat stream emits audio events that
+ * reference a segment id; the client fetches the raw bytes here instead of
+ * receiving them base64-encoded inside the SSE stream.
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { takeAudio, takeAudioStream } from '../../lib/services/voice-service';
+
+// Serves process-local buffers, so keep it on the Node runtime and dynamic
+export const runtime = 'nodejs';
+export const dynamic = 'force-dynamic';
+
+export async function GET(request: NextRequest) {
+    const { searchParams } = new URL(request.url);
+    const id = searchParams.get('id');
+
+    if (!id) {
+        return NextResponse.json(
+            { error: 'No audio id provided' },
+            { status: 400 }
+        );
+    }
+
+    // In-flight segments: relay chunks to the client as synthesis produces
+    // them instead of waiting for the full waveform
+    const audioStream = takeAudioStream(id);
+
+    if (audioStream) {
+        const stream = new ReadableStream({
+            async start(controller) {
+                try {
+                    for await (const chunk of audioStream) {
+                        controller.enqueue(chunk);
+                    }
+                } finally {
+                    controller.close();
+                }
+            }
+        });
+
+        return new Response(stream, {
+            headers: {
+                'Content-Type': 'audio/mpeg',
+                'Cache-Control': 'no-store'
+            }
+        });
+    }
+
+    const audio = takeAudio(id);
+
+    if (!audio) {
+        return NextResponse.json(
+            { error: 'Audio segment not found' },
+            { status: 404 }
+        );
+    }
+
+    return new NextResponse(new Uint8Array(audio), {
+        headers: {
+            'Content-Type': 'audio/mpeg',
+            'Cache-Control': 'no-store'
+        }
+    });
+}
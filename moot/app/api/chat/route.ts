@@ -6,21 +6,76 @@
  */
 
 import { NextRequest } from 'next/server';
-import { Runner, StreamingMode, isFinalResponse } from '@google/adk';
+import { StreamingMode, isFinalResponse } from '@google/adk';
 import { Content, Part } from '@google/genai';
-import { legalAgent, sessionService, APP_NAME, PERSONA_INSTRUCTIONS } from '../../lib/agent/legal-agent';
-import { generateSpeech, stripMarkdown } from '../../lib/services/voice-service';
+import { legalRunner, sessionService, APP_NAME, PERSONA_INSTRUCTIONS } from '../../lib/agent/legal-agent';
+import { generateSpeech, generateSpeechStream, storeAudioStream, stripMarkdown, SentenceSplitter } from '../../lib/services/voice-service';
 import { ChatRequest, CaseContextRequest } from '../../lib/types';
 import { setSessionContext } from '../../lib/tools/document-reader';
+import { sseFrame, sseContentFrame, SSE_DONE_FRAME } from '../../lib/sse';
+
+// Streaming SSE endpoint: pin the Node.js runtime (Buffer-based TTS handling)
+// and opt out of any static optimization of the response
+export const runtime = 'nodejs';
+export const dynamic = 'force-dynamic';
 
 export async function POST(request: NextRequest) {
-    const encoder = new TextEncoder();
+    // Set when the client aborts mid-stream - the flush timer fires outside
+    // start()'s try/catch, so an enqueue after cancellation would otherwise
+    // be an uncaught exception in a timer callback
+    let streamClosed = false;
 
     // Create a streaming response
     const stream = new ReadableStream({
         async start(controller) {
+            // Coalesce bursts of small frames into one enqueued buffer so the
+            // transport does fewer tiny writes. Flush at 8 pending frames or
+            // after 5ms - short enough that streaming still feels real-time.
+            let pending: Uint8Array[] = [];
+            let flushTimer: ReturnType<typeof setTimeout> | null = null;
+
+            const flushPending = () => {
+                if (flushTimer) {
+                    clearTimeout(flushTimer);
+                    flushTimer = null;
+                }
+                if (pending.length === 0 || streamClosed) {
+                    pending = [];
+                    return;
+                }
+                try {
+                    if (pending.length === 1) {
+                        controller.enqueue(pending[0]);
+                    } else {
+                        let total = 0;
+                        for (const frame of pending) total += frame.byteLength;
+                        const joined = new Uint8Array(total);
+                        let offset = 0;
+                        for (const frame of pending) {
+                            joined.set(frame, offset);
+                            offset += frame.byteLength;
+                        }
+                        controller.enqueue(joined);
+                    }
+                } catch {
+                    // Controller already errored/closed (client gone) - stop
+                    // enqueueing, let the agent loop finish quietly
+                    streamClosed = true;
+                }
+                pending = [];
+            };
+
+            const enqueueFrame = (frame: Uint8Array) => {
+                pending.push(frame);
+                if (pending.length >= 8) {
+                    flushPending();
+                } else if (!flushTimer) {
+                    flushTimer = setTimeout(flushPending, 5);
+                }
+            };
+
             const sendEvent = (data: Record<string, unknown>) => {
-                controller.enqueue(encoder.encode(`data: ${JSON.stringify(data)}\n\n`));
+                enqueueFrame(sseFrame(data));
             };
 
             try {
@@ -29,15 +84,24 @@ export async function POST(request: NextRequest) {
 
                 // Generate or reuse session ID
                 const currentSessionId = session_id || crypto.randomUUID();
-                sendEvent({ type: 'session', session_id: currentSessionId });
 
-                // Ensure session exists - ADK handles session memory automatically
-                let session = await sessionService.getSession({
+                // Kick off the session lookup immediately - the session id is
+                // already known, so the SSE handshake below overlaps the
+                // (potentially KV) round-trip instead of waiting behind it
+                const sessionLookup = sessionService.getSession({
                     appName: APP_NAME,
                     userId: user_id,
                     sessionId: currentSessionId
                 });
 
+                sendEvent({ type: 'session', session_id: currentSessionId });
+
+                // Set session context for document tools so they can access session-scoped docs
+                setSessionContext(currentSessionId);
+
+                // Ensure session exists - ADK handles session memory automatically
+                let session = await sessionLookup;
+
                 if (!session) {
                     session = await sessionService.createSession({
                         appName: APP_NAME,
@@ -62,13 +126,20 @@ export async function POST(request: NextRequest) {
 
                 // Build user message with case context
                 let userMessage = message;
-                
-                // Always prepend persona context if we have it - ensures agent knows its role
+
+                // Prepend persona context only on the session's first turn - the
+                // model keeps it via ADK conversation history afterwards, so
+                // re-sending the blob would just inflate prompt tokens (and
+                // time-to-first-token) on every subsequent message
                 if (effectiveContext) {
-                    const persona = effectiveContext.ai_persona || 'assistant';
-                    const personaBehavior = PERSONA_INSTRUCTIONS[persona] || PERSONA_INSTRUCTIONS.assistant;
+                    const modelHasSeenContext =
+                        !!session.state?.case_context && (session.events?.length || 0) > 0;
 
-                    const contextPrefix = `[CASE CONTEXT]
+                    if (!modelHasSeenContext) {
+                        const persona = effectiveContext.ai_persona || 'assistant';
+                        const personaBehavior = PERSONA_INSTRUCTIONS[persona] || PERSONA_INSTRUCTIONS.assistant;
+
+                        const contextPrefix = `[CASE CONTEXT]
 Case Type: ${effectiveContext.case_type}
 Difficulty: ${effectiveContext.difficulty}
 ${effectiveContext.uploaded_files ? `Available Documents: ${effectiveContext.uploaded_files.join(', ')}` : ''}
@@ -78,23 +149,17 @@ ${personaBehavior}
 [END CONTEXT]
 
 User message: `;
-                    userMessage = contextPrefix + message;
-                    
+                        userMessage = contextPrefix + message;
+                    }
+
                     // Save context to session state if not already there
                     if (!session.state?.case_context) {
                         session.state = { ...session.state, case_context: effectiveContext };
                     }
                 }
 
-                // Create Runner with session service - ADK handles history automatically
-                const runner = new Runner({
-                    agent: legalAgent,
-                    appName: APP_NAME,
-                    sessionService: sessionService
-                });
-
-                // Set session context for document tools so they can access session-scoped docs
-                setSessionContext(currentSessionId);
+                // Shared Runner from the agent module - ADK handles history automatically
+                const runner = legalRunner;
 
                 // Create the user message content
                 const userContent: Content = {
@@ -105,6 +170,45 @@ User message: `;
                 // Run the agent with streaming
                 let fullTextResponse = '';
 
+                // Pipelined TTS: dispatch speech generation as soon as each sentence
+                // completes so synthesis overlaps the rest of the model stream.
+                // The stream store hands out the segment id before any audio
+                // exists, so the reference is emitted immediately and /api/audio
+                // relays bytes to the client while ElevenLabs is still
+                // synthesizing - no collect-then-forward step at all.
+                const sentenceSplitter = new SentenceSplitter();
+
+                // The sidechannel store is process-local, so it only works when
+                // /api/audio is guaranteed to hit the same instance as this
+                // stream. KV-backed deployments exist precisely because a
+                // second instance can serve the same session - there, audio
+                // goes inline (base64 in the SSE stream itself, no instance
+                // affinity), emitted in sentence order via a promise chain
+                // while synthesis still starts immediately per sentence.
+                const useAudioSidechannel = !process.env.KV_REST_API_URL;
+                let inlineAudioChain = Promise.resolve();
+
+                // Single TTS entry point for both the per-sentence loop and the
+                // trailing flush - both call sites already guard on voice_id
+                const dispatchTts = (sentence: string) => {
+                    const cleanSentence = stripMarkdown(sentence);
+                    if (!cleanSentence) {
+                        return;
+                    }
+                    if (useAudioSidechannel) {
+                        const audioId = storeAudioStream(generateSpeechStream(cleanSentence, voice_id!));
+                        sendEvent({ type: 'audio', url: `/api/audio?id=${audioId}` });
+                    } else {
+                        const audioPromise = generateSpeech(cleanSentence, voice_id!);
+                        inlineAudioChain = inlineAudioChain.then(async () => {
+                            const audio = await audioPromise;
+                            if (audio) {
+                                sendEvent({ type: 'audio', data: audio });
+                            }
+                        });
+                    }
+                };
+
                 const events = runner.runAsync({
                     userId: user_id,
                     sessionId: currentSessionId,
@@ -214,7 +318,14 @@ User message: `;
                                 if (cleanText.trim()) {
                                     fullTextResponse += part.text;
                                     console.log('Sending content event');
-                                    sendEvent({ type: 'content', content: cleanText });
+                                    enqueueFrame(sseContentFrame(cleanText));
+
+                                    // Feed the TTS pipeline with completed sentences
+                                    if (voice_id) {
+                                        for (const sentence of sentenceSplitter.push(part.text)) {
+                                            dispatchTts(sentence);
+                                        }
+                                    }
                                 }
                             } else {
                                 console.log('Part has no text property');
@@ -230,24 +341,22 @@ User message: `;
                     }
                 }
 
-                // Generate audio for the complete response if voice is selected
-                if (voice_id && fullTextResponse.trim()) {
-                    const sentences = fullTextResponse.split(/(?<=[.!?])\s+/);
-
-                    for (const sentence of sentences) {
-                        if (sentence.trim()) {
-                            const cleanSentence = stripMarkdown(sentence);
-                            if (cleanSentence) {
-                                const audio = await generateSpeech(cleanSentence, voice_id);
-                                if (audio) {
-                                    sendEvent({ type: 'audio', data: audio });
-                                }
-                            }
-                        }
+                // Flush the trailing partial sentence. Its stream reference is
+                // emitted immediately; /api/audio delivers the bytes even after
+                // this SSE response closes.
+                if (voice_id) {
+                    const trailing = sentenceSplitter.flush();
+                    if (trailing) {
+                        dispatchTts(trailing);
                     }
                 }
 
-                sendEvent({ type: 'done' });
+                // Inline audio travels in this stream, so drain any pending
+                // segments before signalling completion (no-op in sidechannel
+                // mode - the chain stays resolved)
+                await inlineAudioChain;
+
+                enqueueFrame(SSE_DONE_FRAME);
 
             } catch (error) {
                 console.error('Chat error:', error);
@@ -256,8 +365,18 @@ User message: `;
                     error: error instanceof Error ? error.message : 'Unknown error'
                 });
             } finally {
-                controller.close();
+                flushPending();
+                if (!streamClosed) {
+                    try {
+                        controller.close();
+                    } catch {
+                        // Already closed by cancellation - nothing to do
+                    }
+                }
             }
+        },
+        cancel() {
+            streamClosed = true;
         }
     });
 
@@ -265,7 +384,11 @@ User message: `;
         headers: {
             'Content-Type': 'text/event-stream',
             'Cache-Control': 'no-cache',
-            'Connection': 'keep-alive'
+            'Connection': 'keep-alive',
+            // Tell nginx-style proxies not to buffer the stream - otherwise
+            // token and audio frames get coalesced into large chunks and the
+            // real-time feel is lost behind a reverse proxy
+            'X-Accel-Buffering': 'no'
         }
     });
 }
@@ -8,22 +8,24 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { getGeneratedDocument, listGeneratedDocuments } from '../../lib/tools/document-generator';
 
+// Security: Only allow alphanumeric, underscore, dash, and dots.
+// Compiled once at module load rather than per request.
+const SAFE_FILENAME = /^[a-zA-Z0-9_\-.]+$/;
+
 export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url);
     const filename = searchParams.get('filename');
 
     // If filename provided, download that document
     if (filename) {
-        // Security: Only allow alphanumeric, underscore, dash, and dots
-        const safeChars = /^[a-zA-Z0-9_\-.]+$/;
-        if (!safeChars.test(filename)) {
+        if (!SAFE_FILENAME.test(filename)) {
             return NextResponse.json(
                 { error: 'Invalid filename' },
                 { status: 400 }
             );
         }
 
-        const doc = getGeneratedDocument(filename);
+        const doc = await getGeneratedDocument(filename);
 
         if (!doc) {
             return NextResponse.json(
@@ -10,12 +10,31 @@ import fs from 'fs';
 import path from 'path';
 
 const DB_PATH = path.join(process.cwd(), '.documents.json');
-const KV_STORE_KEY = 'moot:documents';
 
+// KV layout mirrors document-reader: one hash per session, field = doc id
+const KV_SESSION_PREFIX = 'moot:documents:';
+
+function kvSessionKey(sessionId: string): string {
+    return KV_SESSION_PREFIX + sessionId;
+}
+
+// Memoized at first use - the env doesn't change at runtime
+let kvAvailable: boolean | null = null;
 function isKVAvailable(): boolean {
-    const available = !!process.env.KV_REST_API_URL;
-    console.log(`KV check: ${available ? 'Using Upstash KV' : 'Using file storage'}`);
-    return available;
+    if (kvAvailable === null) {
+        kvAvailable = !!process.env.KV_REST_API_URL;
+        console.log(`KV check: ${kvAvailable ? 'Using Upstash KV' : 'Using file storage'}`);
+    }
+    return kvAvailable;
+}
+
+// KV client loaded lazily but resolved once per process
+let kvModule: Promise<typeof import('@vercel/kv')> | null = null;
+function getKv() {
+    if (!kvModule) {
+        kvModule = import('@vercel/kv');
+    }
+    return kvModule;
 }
 
 interface DocumentItem {
@@ -30,35 +49,73 @@ interface DocumentStore {
     };
 }
 
-async function loadStoreAsync(): Promise<DocumentStore> {
+// Move documents between session hashes in KV. HSET into the destination
+// and HDEL from the source are each atomic per doc, so a concurrent upload
+// to either session can't be lost the way a whole-store read-modify-write
+// could drop it.
+async function moveInKV(fromSession: string, toSession: string, documentIds?: string[]): Promise<number> {
+    const { kv } = await getKv();
+    const sourceDocs = await kv.hgetall<{ [docId: string]: DocumentItem }>(kvSessionKey(fromSession)) || {};
+
+    const idsToMove = documentIds || Object.keys(sourceDocs);
+    const moved: { [docId: string]: DocumentItem } = {};
+
+    for (const docId of idsToMove) {
+        if (sourceDocs[docId]) {
+            moved[docId] = sourceDocs[docId];
+            console.log(`Moved document ${docId} from ${fromSession} to ${toSession}`);
+        }
+    }
+
+    const movedIds = Object.keys(moved);
+    if (movedIds.length > 0) {
+        await kv.hset(kvSessionKey(toSession), moved);
+        await kv.hdel(kvSessionKey(fromSession), ...movedIds);
+    }
+    return movedIds.length;
+}
+
+// Local dev keeps the single JSON file; uploads are serialized in-process,
+// so the whole-store rewrite is safe here
+function moveInFile(fromSession: string, toSession: string, documentIds?: string[]): number {
+    let store: DocumentStore = {};
     try {
-        if (isKVAvailable()) {
-            const { kv } = await import('@vercel/kv');
-            const data = await kv.get<DocumentStore>(KV_STORE_KEY);
-            return data || {};
-        } else {
-            if (fs.existsSync(DB_PATH)) {
-                const data = fs.readFileSync(DB_PATH, 'utf-8');
-                return JSON.parse(data);
-            }
+        if (fs.existsSync(DB_PATH)) {
+            store = JSON.parse(fs.readFileSync(DB_PATH, 'utf-8'));
         }
     } catch (e) {
         console.error('Failed to load document store:', e);
     }
-    return {};
-}
 
-async function saveStoreAsync(store: DocumentStore): Promise<void> {
-    try {
-        if (isKVAvailable()) {
-            const { kv } = await import('@vercel/kv');
-            await kv.set(KV_STORE_KEY, store);
-        } else {
-            fs.writeFileSync(DB_PATH, JSON.stringify(store, null, 2), 'utf-8');
+    const sourceSession = store[fromSession] || {};
+
+    if (!store[toSession]) {
+        store[toSession] = {};
+    }
+
+    let movedCount = 0;
+    const idsToMove = documentIds || Object.keys(sourceSession);
+
+    for (const docId of idsToMove) {
+        if (sourceSession[docId]) {
+            store[toSession][docId] = sourceSession[docId];
+            delete sourceSession[docId];
+            movedCount++;
+            console.log(`Moved document ${docId} from ${fromSession} to ${toSession}`);
         }
+    }
+
+    // Clean up empty source session
+    if (Object.keys(sourceSession).length === 0) {
+        delete store[fromSession];
+    }
+
+    try {
+        fs.writeFileSync(DB_PATH, JSON.stringify(store, null, 2), 'utf-8');
     } catch (e) {
         console.error('Failed to save document store:', e);
     }
+    return movedCount;
 }
 
 export async function POST(request: NextRequest) {
@@ -73,36 +130,9 @@ export async function POST(request: NextRequest) {
             );
         }
 
-        const store = await loadStoreAsync();
-        const sourceSession = store[from_session] || {};
-
-        if (!store[to_session]) {
-            store[to_session] = {};
-        }
-
-        let movedCount = 0;
-
-        // If document_ids provided, move only those; otherwise move all
-        const idsToMove = document_ids || Object.keys(sourceSession);
-
-        for (const docId of idsToMove) {
-            if (sourceSession[docId]) {
-                store[to_session][docId] = sourceSession[docId];
-                delete sourceSession[docId];
-                movedCount++;
-                console.log(`Moved document ${docId} from ${from_session} to ${to_session}`);
-            }
-        }
-
-        // Update source session
-        store[from_session] = sourceSession;
-
-        // Clean up empty source session
-        if (Object.keys(sourceSession).length === 0) {
-            delete store[from_session];
-        }
-
-        await saveStoreAsync(store);
+        const movedCount = isKVAvailable()
+            ? await moveInKV(from_session, to_session, document_ids)
+            : moveInFile(from_session, to_session, document_ids);
 
         return NextResponse.json({
             success: true,
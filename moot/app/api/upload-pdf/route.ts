@@ -1,13 +1,30 @@
 /**
  * Upload PDF API Route
- * 
+ *
  * Handle PDF file uploads with text extraction using unpdf.
- * unpdf is designed for serverless environments and works well with Next.js.
+ * unpdf wraps PDF.js's native text extractor, is designed for serverless
+ * environments, and works well with Next.js - no slow pure-JS parsing path.
  */
 
 import { NextRequest, NextResponse } from 'next/server';
+import { createHash } from 'crypto';
 import { addDocument } from '../../lib/tools/document-reader';
-import { extractText } from 'unpdf';
+
+// Extraction results keyed by content hash - re-uploads of the same PDF
+// (retries, case restarts) skip the parse entirely. Bounded FIFO, same
+// eviction style as the document-generator response cache.
+const extractCache = new Map<string, string>();
+const EXTRACT_CACHE_MAX = 32;
+
+// unpdf (PDF.js under the hood) is only needed for PDF uploads - load it on
+// first use instead of at cold start, cached per process
+let unpdfModule: Promise<typeof import('unpdf')> | null = null;
+function getUnpdf() {
+    if (!unpdfModule) {
+        unpdfModule = import('unpdf');
+    }
+    return unpdfModule;
+}
 
 export async function POST(request: NextRequest) {
     try {
@@ -25,30 +42,50 @@ export async function POST(request: NextRequest) {
         // Generate file ID
         const fileId = crypto.randomUUID();
 
-        // Read file content
-        const arrayBuffer = await file.arrayBuffer();
-        const buffer = new Uint8Array(arrayBuffer);
-
         let textContent = '';
 
-        // Extract text based on file type
-        if (file.name.toLowerCase().endsWith('.pdf')) {
-            try {
-                // Use unpdf for reliable text extraction in serverless environments
-                const result = await extractText(buffer);
-                // unpdf returns { text: string[] } - join pages into single string
-                textContent = Array.isArray(result.text) ? result.text.join('\n') : String(result.text);
-                console.log(`PDF parsed successfully: ${file.name} (${textContent.length} chars)`);
-            } catch (error) {
-                console.error('Error parsing PDF:', error);
-                // Fallback: store metadata if extraction fails
-                textContent = `[PDF Document: ${file.name}] Size: ${buffer.length} bytes. Note: PDF text extraction failed.`;
+        // Extract text based on file type. Only PDFs need the raw bytes in
+        // memory; everything else streams straight through the File's own
+        // UTF-8 decode without materializing an extra Buffer copy.
+        const lowerName = file.name.toLowerCase();
+        if (lowerName.endsWith('.pdf')) {
+            const buffer = Buffer.from(await file.arrayBuffer());
+            const contentKey = createHash('sha256').update(buffer).digest('hex');
+            const cached = extractCache.get(contentKey);
+
+            if (cached !== undefined) {
+                textContent = cached;
+                console.log(`PDF extraction cache hit: ${file.name} (${textContent.length} chars)`);
+            } else {
+                try {
+                    // Use unpdf for reliable text extraction in serverless environments
+                    const { extractText } = await getUnpdf();
+                    const result = await extractText(buffer);
+                    // unpdf returns { text: string[] } - join pages into a single
+                    // string with a "Page N" marker heading each one, so
+                    // read_document section requests like "Page 3" land on the
+                    // marker and stop at the next page instead of scanning the
+                    // whole document
+                    textContent = Array.isArray(result.text)
+                        ? result.text.map((pageText, i) => `Page ${i + 1}\n${pageText}`).join('\n\n')
+                        : String(result.text);
+                    console.log(`PDF parsed successfully: ${file.name} (${textContent.length} chars)`);
+
+                    // Only successful extractions are worth remembering
+                    if (extractCache.size >= EXTRACT_CACHE_MAX) {
+                        const oldest = extractCache.keys().next().value;
+                        if (oldest) extractCache.delete(oldest);
+                    }
+                    extractCache.set(contentKey, textContent);
+                } catch (error) {
+                    console.error('Error parsing PDF:', error);
+                    // Fallback: store metadata if extraction fails
+                    textContent = `[PDF Document: ${file.name}] Size: ${buffer.length} bytes. Note: PDF text extraction failed.`;
+                }
             }
-        } else if (file.name.toLowerCase().endsWith('.txt') || file.name.toLowerCase().endsWith('.md')) {
-            textContent = Buffer.from(buffer).toString('utf-8');
         } else {
-            // For other file types, try to read as text
-            textContent = Buffer.from(buffer).toString('utf-8');
+            // .txt, .md, and anything else we treat as text
+            textContent = await file.text();
         }
 
         // Add to document store with session scope
@@ -57,7 +94,7 @@ export async function POST(request: NextRequest) {
         console.log(`Upload request: session_id from form=${sessionId}, using=${effectiveSessionId}`);
         await addDocument(effectiveSessionId, fileId, file.name, textContent, file.type);
 
-        console.log(`Uploaded file: ${file.name} (${buffer.length} bytes)`);
+        console.log(`Uploaded file: ${file.name} (${file.size} bytes)`);
 
         return NextResponse.json({
             file_id: fileId,
@@ -1,16 +1,46 @@
 /**
  * Voices API Route
- * 
+ *
  * Get available voices from ElevenLabs.
  * Replaces the Python FastAPI /voices endpoint.
  */
 
 import { NextResponse } from 'next/server';
 import { getVoices } from '../../lib/services/voice-service';
+import { Voice } from '../../lib/types';
+
+// The voice list changes rarely, so serve it from an in-process cache and
+// only hit ElevenLabs once per TTL. Concurrent misses share one in-flight
+// fetch instead of stampeding the API.
+const VOICES_TTL_MS = 5 * 60 * 1000;
+let voicesCache: { fetchedAt: number; voices: Voice[] } | null = null;
+let voicesInFlight: Promise<Voice[]> | null = null;
+
+async function getVoicesCached(): Promise<Voice[]> {
+    if (voicesCache && Date.now() - voicesCache.fetchedAt < VOICES_TTL_MS) {
+        return voicesCache.voices;
+    }
+
+    if (!voicesInFlight) {
+        voicesInFlight = getVoices()
+            .then(voices => {
+                // Don't cache failures/empty results - retry on the next hit
+                if (voices.length > 0) {
+                    voicesCache = { fetchedAt: Date.now(), voices };
+                }
+                return voices;
+            })
+            .finally(() => {
+                voicesInFlight = null;
+            });
+    }
+
+    return voicesInFlight;
+}
 
 export async function GET() {
     try {
-        const voices = await getVoices();
+        const voices = await getVoicesCached();
         return NextResponse.json({ voices });
     } catch (error) {
         console.error('Error fetching voices:', error);
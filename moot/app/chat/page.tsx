@@ -35,7 +35,7 @@ export default function Home() {
     // Staging file IDs from CaseSetup - files are uploaded to 'staging' session, then moved
     const pendingStagingIdsRef = useRef<string[]>([]);
 
-    const { addToQueue, stop: stopAudio, isPlaying: isAudioPlaying, markStreamComplete } = useAudioQueue();
+    const { addToQueue, addBufferToQueue, stop: stopAudio, isPlaying: isAudioPlaying, markStreamComplete } = useAudioQueue();
     const [messages, setMessages] = useState<Message[]>([]);
 
     // Move documents from staging session to the real session
@@ -187,6 +187,10 @@ export default function Home() {
             let accumulatedContent = "";
             let buffer = "";
 
+            // Audio segments are fetched from the binary sidechannel in
+            // parallel but enqueued in arrival order of their events
+            let audioEnqueueChain = Promise.resolve();
+
             while (true) {
                 const { done, value } = await reader.read();
                 if (done) break;
@@ -231,8 +235,23 @@ export default function Home() {
                                         : msg
                                 ));
                             } else if (data.type === 'audio') {
-                                // Add audio chunk to queue
-                                addToQueue(data.data);
+                                if (data.url) {
+                                    // Fetch raw audio bytes from the sidechannel;
+                                    // start the fetch now, enqueue in order
+                                    const fetchPromise = fetch(data.url)
+                                        .then(res => (res.ok ? res.arrayBuffer() : null))
+                                        .catch(() => null);
+                                    audioEnqueueChain = audioEnqueueChain.then(async () => {
+                                        const audioData = await fetchPromise;
+                                        // Streamed segments can end empty if TTS failed
+                                        if (audioData && audioData.byteLength > 0) {
+                                            await addBufferToQueue(audioData);
+                                        }
+                                    });
+                                } else if (data.data) {
+                                    // Inline base64 audio (legacy)
+                                    addToQueue(data.data);
+                                }
                             } else if (data.type === 'citation' && (data.citation_type === 'document' || data.citation_type === 'generated')) {
                                 // Generated documents - add to citations panel
                                 console.log('Generated document:', data.title);
@@ -55,8 +55,10 @@ export const CaseSetup: FC<CaseSetupProps> = ({ onComplete, onCancel }) => {
 
         setIsUploading(true);
 
-        // Upload files immediately to 'staging' session - they'll be moved to real session later
-        for (const file of Array.from(files)) {
+        // Upload files immediately to 'staging' session - they'll be moved to real session later.
+        // All files go up concurrently so server-side text extraction overlaps
+        // across the batch instead of serializing file-by-file.
+        await Promise.all(Array.from(files).map(async (file) => {
             try {
                 const formData = new FormData();
                 formData.append('file', file);
@@ -77,7 +79,7 @@ export const CaseSetup: FC<CaseSetupProps> = ({ onComplete, onCancel }) => {
             } catch (err) {
                 console.error('Upload failed:', err);
             }
-        }
+        }));
 
         setIsUploading(false);
         e.target.value = '';
@@ -71,7 +71,7 @@ export const useAudioQueue = () => {
         }
     }, [getAudioContext]);
 
-    const addToQueue = useCallback(async (base64Data: string) => {
+    const addBufferToQueue = useCallback(async (buffer: ArrayBuffer) => {
         // Mark that we're receiving audio
         isReceivingRef.current = true;
 
@@ -86,16 +86,9 @@ export const useAudioQueue = () => {
 
         try {
             const ctx = getAudioContext();
-            // Convert base64 to array buffer
-            const binaryString = window.atob(base64Data);
-            const len = binaryString.length;
-            const bytes = new Uint8Array(len);
-            for (let i = 0; i < len; i++) {
-                bytes[i] = binaryString.charCodeAt(i);
-            }
 
             // Decode audio data
-            const audioBuffer = await ctx.decodeAudioData(bytes.buffer);
+            const audioBuffer = await ctx.decodeAudioData(buffer);
             queueRef.current.push(audioBuffer);
             console.log('🔊 Audio chunk decoded and added to queue, new length:', queueRef.current.length);
 
@@ -108,6 +101,18 @@ export const useAudioQueue = () => {
         }
     }, [getAudioContext, playNext]);
 
+    // Legacy base64 path - kept for any events that still carry inline data
+    const addToQueue = useCallback(async (base64Data: string) => {
+        // Convert base64 to array buffer
+        const binaryString = window.atob(base64Data);
+        const len = binaryString.length;
+        const bytes = new Uint8Array(len);
+        for (let i = 0; i < len; i++) {
+            bytes[i] = binaryString.charCodeAt(i);
+        }
+        return addBufferToQueue(bytes.buffer);
+    }, [addBufferToQueue]);
+
     // Call this when the stream is complete to allow playback to end
     const markStreamComplete = useCallback(() => {
         console.log('🔊 Stream marked complete - will stop after queue empties');
@@ -161,6 +166,7 @@ export const useAudioQueue = () => {
 
     return {
         addToQueue,
+        addBufferToQueue,
         stop,
         isPlaying,
         markStreamComplete
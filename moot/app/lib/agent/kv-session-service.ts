@@ -0,0 +1,123 @@
+/**
+ * KV-backed Session Service
+ *
+ * Persists ADK sessions to Vercel KV (Upstash Redis) so conversations survive
+ * server restarts and cold serverless invocations, and multiple instances can
+ * serve the same user. Falls back to plain in-memory behavior when
+ * KV_REST_API_URL is not configured (local dev), mirroring the storage
+ * abstraction in tools/document-reader.
+ */
+
+import { InMemorySessionService } from '@google/adk';
+
+// Check if Vercel KV (Upstash Redis) is available - check at runtime, not module load
+function isKVAvailable(): boolean {
+    return !!process.env.KV_REST_API_URL;
+}
+
+// KV client loaded lazily but resolved once per process
+let kvModule: Promise<typeof import('@vercel/kv')> | null = null;
+function getKv() {
+    if (!kvModule) {
+        kvModule = import('@vercel/kv');
+    }
+    return kvModule;
+}
+
+// Sessions expire after 24h of inactivity
+const SESSION_TTL_SECONDS = 86400;
+
+interface PersistedSession {
+    state: Record<string, unknown>;
+    events: unknown[];
+}
+
+interface SessionKey {
+    appName: string;
+    userId: string;
+    sessionId: string;
+}
+
+function kvKey({ appName, userId, sessionId }: SessionKey): string {
+    return `moot:session:${appName}:${userId}:${sessionId}`;
+}
+
+export class KVSessionService extends InMemorySessionService {
+    // Suppresses KV writes while replaying persisted events into memory
+    private restoring = false;
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    override async getSession(req: any): Promise<any> {
+        const session = await super.getSession(req);
+        if (session || !isKVAvailable()) {
+            return session;
+        }
+
+        // Cold read: this instance hasn't seen the session - hydrate from KV
+        try {
+            const { kv } = await getKv();
+            const saved = await kv.get<PersistedSession>(kvKey(req));
+            if (!saved) {
+                return session;
+            }
+
+            console.log(`Restoring session ${req.sessionId} from KV (${saved.events?.length || 0} events)`);
+            this.restoring = true;
+            try {
+                const restored = await super.createSession({
+                    appName: req.appName,
+                    userId: req.userId,
+                    sessionId: req.sessionId,
+                    state: saved.state || {}
+                });
+                for (const event of saved.events || []) {
+                    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+                    await super.appendEvent(restored as any, event as any);
+                }
+            } finally {
+                this.restoring = false;
+            }
+            return await super.getSession(req);
+        } catch (e) {
+            console.error('[KVSessionService] Failed to restore session from KV:', e);
+            return session;
+        }
+    }
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    override async createSession(req: any): Promise<any> {
+        const session = await super.createSession(req);
+        await this.persist({ appName: req.appName, userId: req.userId, sessionId: session.id }, session);
+        return session;
+    }
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    override async appendEvent(session: any, event: any): Promise<any> {
+        const result = await super.appendEvent(session, event);
+        await this.persist(
+            { appName: session.appName, userId: session.userId, sessionId: session.id },
+            session
+        );
+        return result;
+    }
+
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    private async persist(key: SessionKey, session: any): Promise<void> {
+        if (this.restoring || !isKVAvailable()) {
+            return;
+        }
+        try {
+            const { kv } = await getKv();
+            const payload: PersistedSession = {
+                state: session.state || {},
+                events: session.events || []
+            };
+            await kv.set(kvKey(key), payload, { ex: SESSION_TTL_SECONDS });
+        } catch (e) {
+            // Persistence is best-effort - the in-memory session keeps working
+            console.error('[KVSessionService] Failed to persist session to KV:', e);
+        }
+    }
+}
+
+export default KVSessionService;
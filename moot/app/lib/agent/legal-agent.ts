@@ -4,12 +4,14 @@
  * Uses LlmAgent with FunctionTool wrappers and proper session management.
  */
 
-import { LlmAgent, FunctionTool, InMemorySessionService } from '@google/adk';
+import { LlmAgent, FunctionTool, Runner } from '@google/adk';
+import { KVSessionService } from './kv-session-service';
 import { z } from 'zod';
 import { webSearch } from '../tools/web-search';
 import { readDocument, listDocuments } from '../tools/document-reader';
 import { generateDocument } from '../tools/document-generator';
 import { provideLink } from '../tools/provide-link';
+import { executeToolsParallel } from '../tools/parallel';
 
 // 1. Web Search Tool
 const WebSearchSchema = z.object({
@@ -104,6 +106,26 @@ const provideLinkTool = new FunctionTool<any>({
     }
 });
 
+// 5. Batch Tool - lets the model fan out several independent tool calls in one turn
+const BatchToolSchema = z.object({
+    invocations: z.array(z.object({
+        tool_name: z.string().describe("Name of the tool to invoke (e.g., 'web_search', 'read_document')"),
+        arguments: z.record(z.unknown()).describe("Arguments object for that tool")
+    })).describe("List of independent tool invocations to run concurrently")
+});
+
+type BatchToolParams = z.infer<typeof BatchToolSchema>;
+
+const batchTool = new FunctionTool<any>({
+    name: 'batch_tool',
+    description: 'Run multiple independent tool calls concurrently in a single turn. Pass a list of {tool_name, arguments} invocations; results are returned in the same order.',
+    parameters: BatchToolSchema,
+    execute: async (params: BatchToolParams) => {
+        const results = await executeToolsParallel(params.invocations);
+        return { result: results.join('\n\n---\n\n') };
+    }
+});
+
 // Base instruction - ONLY tools and voice rules
 const LEGAL_AGENT_INSTRUCTION = `You are a Legal Agent. Your responses will be read aloud via text-to-speech.
 
@@ -113,6 +135,7 @@ const LEGAL_AGENT_INSTRUCTION = `You are a Legal Agent. Your responses will be r
 3. **generate_document** - Create legal documents (memo, brief, summary, outline, contract_draft, letter).
 4. **provide_link** - Share a document with the user. Use AFTER generating.
 5. **list_documents** - Check what documents are available.
+6. **batch_tool** - Run several independent tool calls at once. When you need multiple independent pieces of information, call batch_tool with all invocations in a single response instead of calling tools one at a time.
 
 **CRITICAL: Use Your Tools**
 - ACTUALLY CALL read_document when asked to read - don't fake it
@@ -171,18 +194,37 @@ When session starts: "I'm here and ready to answer your questions."`,
 When session starts: "Ready when you are. Present your argument and I'll give you feedback."`
 };
 
-// Create the LlmAgent
-export const legalAgent = new LlmAgent({
-    name: 'legal_agent',
-    model: 'gemini-2.5-flash',
-    description: 'Legal agent for analysis, arguments, and research.',
-    instruction: LEGAL_AGENT_INSTRUCTION,
-    tools: [webSearchTool, readDocumentTool, generateDocumentTool, provideLinkTool, listDocumentsTool]
-});
-
-// Singleton session service
-export const sessionService = new InMemorySessionService();
+/**
+ * Factory for the legal agent. The single construction point for the
+ * LlmAgent - variants (different model, trimmed tool list) should be
+ * parameterized here rather than duplicating the agent block.
+ */
+export function createLegalAgent(model: string = 'gemini-2.5-flash'): LlmAgent {
+    return new LlmAgent({
+        name: 'legal_agent',
+        model,
+        description: 'Legal agent for analysis, arguments, and research.',
+        instruction: LEGAL_AGENT_INSTRUCTION,
+        tools: [webSearchTool, readDocumentTool, generateDocumentTool, provideLinkTool, listDocumentsTool, batchTool]
+    });
+}
+
+// The shared agent instance - built once at module load
+export const legalAgent = createLegalAgent();
+
+// Singleton session service - persists to Vercel KV when configured,
+// pure in-memory otherwise
+export const sessionService = new KVSessionService();
 
 export const APP_NAME = 'moot_app';
 
+// Shared Runner - stateless across requests (conversation state lives in the
+// session service), so construct it once at module load instead of rebuilding
+// the agent graph and tool validation on every message
+export const legalRunner = new Runner({
+    agent: legalAgent,
+    appName: APP_NAME,
+    sessionService: sessionService
+});
+
 export default legalAgent;
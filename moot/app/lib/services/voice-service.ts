@@ -8,14 +8,43 @@ import { Voice } from '../types';
 
 const ELEVENLABS_API_URL = 'https://api.elevenlabs.io/v1';
 
+// Voice settings are identical for every request - build the object once
+const VOICE_SETTINGS = {
+    stability: 0.5,
+    similarity_boost: 0.75
+};
+
+// Resolved once and reused across requests. Node's undici fetch agent
+// already pools and keeps alive connections per origin, so the env lookup
+// and header construction were the remaining per-call setup costs.
+let cachedApiKey: string | null | undefined;
+let cachedTtsHeaders: Record<string, string> | null = null;
+let cachedVoicesHeaders: Record<string, string> | null = null;
+
 /**
  * Get the ElevenLabs API key from environment
  */
 function getApiKey(): string | null {
-    // Note: Vercel doesn't allow env vars starting with digits, so use ELEVENLABS_API_KEY
-    return process.env.ELEVENLABS_API_KEY ||
-        process.env.ELEVEN_API_KEY ||
-        null;
+    if (cachedApiKey === undefined) {
+        // Note: Vercel doesn't allow env vars starting with digits, so use ELEVENLABS_API_KEY
+        cachedApiKey = process.env.ELEVENLABS_API_KEY ||
+            process.env.ELEVEN_API_KEY ||
+            null;
+    }
+    return cachedApiKey;
+}
+
+/**
+ * Shared request headers for TTS calls (built once per process)
+ */
+function getTtsHeaders(apiKey: string): Record<string, string> {
+    if (!cachedTtsHeaders) {
+        cachedTtsHeaders = {
+            'Content-Type': 'application/json',
+            'xi-api-key': apiKey
+        };
+    }
+    return cachedTtsHeaders;
 }
 
 /**
@@ -29,11 +58,13 @@ export async function getVoices(): Promise<Voice[]> {
         return [];
     }
 
+    if (!cachedVoicesHeaders) {
+        cachedVoicesHeaders = { 'xi-api-key': apiKey };
+    }
+
     try {
         const response = await fetch('https://api.elevenlabs.io/v2/voices', {
-            headers: {
-                'xi-api-key': apiKey
-            }
+            headers: cachedVoicesHeaders
         });
 
         if (!response.ok) {
@@ -54,103 +85,380 @@ export async function getVoices(): Promise<Voice[]> {
     }
 }
 
+// ElevenLabs only allows a handful of concurrent syntheses per key; beyond
+// that, requests 429 and the retries end up slower than running serially.
+// Bound the fan-out from the pipelined chat route with a simple counting
+// semaphore - a released slot is handed directly to the next waiter.
+const TTS_CONCURRENCY = Number(process.env.TTS_CONCURRENCY) || 6;
+let activeTtsRequests = 0;
+const ttsWaiters: Array<() => void> = [];
+
+async function acquireTtsSlot(): Promise<void> {
+    if (activeTtsRequests < TTS_CONCURRENCY) {
+        activeTtsRequests++;
+        return;
+    }
+    await new Promise<void>(resolve => ttsWaiters.push(resolve));
+}
+
+function releaseTtsSlot(): void {
+    const next = ttsWaiters.shift();
+    if (next) {
+        next();
+    } else {
+        activeTtsRequests--;
+    }
+}
+
 /**
- * Generate speech from text and return audio as base64-encoded string
+ * Stream speech audio for text as it is synthesized.
+ *
+ * Yields raw audio chunks from ElevenLabs' chunked-transfer stream endpoint
+ * as they arrive, so callers can start forwarding audio before the full
+ * waveform has been generated. Yields nothing on error or missing API key.
  */
-export async function generateSpeech(
+export async function* generateSpeechStream(
     text: string,
     voiceId: string,
     modelId: string = 'eleven_turbo_v2'
-): Promise<string | null> {
+): AsyncGenerator<Uint8Array> {
     const apiKey = getApiKey();
 
     if (!apiKey) {
         console.warn('No ElevenLabs API key - cannot generate speech');
-        return null;
+        return;
     }
 
     if (!text.trim()) {
-        return null;
+        return;
     }
 
+    await acquireTtsSlot();
     try {
         console.log(`Requesting TTS for ${text.length} chars: '${text.slice(0, 50)}...'`);
 
         const response = await fetch(`${ELEVENLABS_API_URL}/text-to-speech/${voiceId}/stream`, {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'xi-api-key': apiKey
-            },
+            headers: getTtsHeaders(apiKey),
             body: JSON.stringify({
                 text,
                 model_id: modelId,
-                voice_settings: {
-                    stability: 0.5,
-                    similarity_boost: 0.75
-                }
+                voice_settings: VOICE_SETTINGS
             })
         });
 
-        if (!response.ok) {
+        if (!response.ok || !response.body) {
             const errorText = await response.text();
             console.error('ElevenLabs API error:', response.status, errorText);
-            return null;
+            return;
         }
 
-        // Get the audio as array buffer
-        const audioBuffer = await response.arrayBuffer();
-
-        // Convert to base64
-        const base64Audio = Buffer.from(audioBuffer).toString('base64');
-
-        console.log(`Received ${audioBuffer.byteLength} bytes of audio`);
-        return base64Audio;
+        // Forward chunks as ElevenLabs produces them
+        const reader = response.body.getReader();
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            if (value && value.byteLength > 0) {
+                yield value;
+            }
+        }
 
     } catch (error) {
         console.error('Error generating speech:', error);
+    } finally {
+        releaseTtsSlot();
+    }
+}
+
+/**
+ * Generate speech from text and return the raw audio bytes
+ */
+export async function generateSpeechAudio(
+    text: string,
+    voiceId: string,
+    modelId: string = 'eleven_turbo_v2'
+): Promise<Buffer | null> {
+    const chunks: Uint8Array[] = [];
+
+    for await (const chunk of generateSpeechStream(text, voiceId, modelId)) {
+        chunks.push(chunk);
+    }
+
+    if (chunks.length === 0) {
         return null;
     }
+
+    const audioBuffer = Buffer.concat(chunks);
+    console.log(`Received ${audioBuffer.byteLength} bytes of audio`);
+    return audioBuffer;
 }
 
 /**
- * Strip markdown formatting and citation markers for TTS
+ * Generate speech from text and return audio as base64-encoded string.
+ *
+ * Inline-audio path, used on multi-instance (KV-backed) deployments where
+ * the process-local sidechannel below can't be relied on. Buffer#toString
+ * ('base64') is native code, so the encode here never ties up the event
+ * loop the way a JS-level loop would.
  */
-export function stripMarkdown(text: string): string {
-    let result = text;
+export async function generateSpeech(
+    text: string,
+    voiceId: string,
+    modelId: string = 'eleven_turbo_v2'
+): Promise<string | null> {
+    const audioBuffer = await generateSpeechAudio(text, voiceId, modelId);
+    return audioBuffer ? audioBuffer.toString('base64') : null;
+}
 
-    // Remove CITATION markers (for citations panel)
-    result = result.replace(/\[CITATION:.*?\]/g, '');
+// ============ AUDIO SIDECHANNEL STORE ============
+
+// Generated audio segments awaiting pickup by /api/audio. SSE is a text
+// protocol, so instead of base64-inflating every payload by ~33% (plus an
+// encode/decode pass on each side), the stream sends a short reference and
+// the client fetches the raw bytes. Same in-process pattern as the
+// generated-documents store.
+//
+// SINGLE-INSTANCE ONLY: the store lives in process memory, and /api/audio
+// has no instance affinity - on multi-instance deployments the GET can
+// land on an instance that never saw the id. The chat route therefore
+// only emits sidechannel references when KV is not configured (the same
+// signal KVSessionService uses for "one instance can't be assumed") and
+// falls back to inline base64 otherwise.
+const audioStore = new Map<string, { audio: Buffer; createdAt: number }>();
+
+// Segments are fetched within seconds; sweep anything older than this
+const AUDIO_TTL_MS = 5 * 60 * 1000;
 
-    // Remove DOWNLOAD_LINK markers
-    result = result.replace(/\[DOWNLOAD_LINK:[^\]]+\]/g, '');
+/**
+ * Store an audio segment and return its retrieval id
+ */
+export function storeAudio(audio: Buffer): string {
+    const now = Date.now();
+    for (const [id, entry] of audioStore) {
+        if (now - entry.createdAt > AUDIO_TTL_MS) {
+            audioStore.delete(id);
+        }
+    }
 
-    // Remove LINK_PROVIDED markers
-    result = result.replace(/\[LINK_PROVIDED:[^\]]+\]/g, '');
+    const id = crypto.randomUUID();
+    audioStore.set(id, { audio, createdAt: now });
+    return id;
+}
 
-    // Remove bold/italic markers
-    result = result.replace(/\*\*(.+?)\*\*/g, '$1');  // **bold**
-    result = result.replace(/\*(.+?)\*/g, '$1');      // *italic*
-    result = result.replace(/__(.+?)__/g, '$1');      // __bold__
-    result = result.replace(/_(.+?)_/g, '$1');        // _italic_
+/**
+ * Retrieve a stored audio segment by id (removing it from the store)
+ */
+export function takeAudio(id: string): Buffer | undefined {
+    const entry = audioStore.get(id);
+    if (entry) {
+        audioStore.delete(id);
+        return entry.audio;
+    }
+    return undefined;
+}
+
+// Streaming variant of the store above: the id is handed out before any
+// audio exists, chunks are appended as ElevenLabs produces them, and
+// /api/audio relays them to the client as they land. Time-to-first-audio-
+// byte drops from "full TTS round trip" to "first TTS packet".
+interface AudioStreamEntry {
+    chunks: Uint8Array[];
+    done: boolean;
+    createdAt: number;
+    notify: (() => void) | null;
+}
+
+const audioStreams = new Map<string, AudioStreamEntry>();
+
+/**
+ * Register an in-flight audio stream and return its retrieval id immediately.
+ *
+ * The source generator is consumed in the background; a client can start
+ * reading via takeAudioStream before synthesis has finished.
+ */
+export function storeAudioStream(source: AsyncGenerator<Uint8Array>): string {
+    const now = Date.now();
+    for (const [staleId, entry] of audioStreams) {
+        if (entry.done && now - entry.createdAt > AUDIO_TTL_MS) {
+            audioStreams.delete(staleId);
+        }
+    }
+
+    const id = crypto.randomUUID();
+    const entry: AudioStreamEntry = { chunks: [], done: false, createdAt: now, notify: null };
+    audioStreams.set(id, entry);
+
+    (async () => {
+        try {
+            for await (const chunk of source) {
+                entry.chunks.push(chunk);
+                entry.notify?.();
+            }
+        } finally {
+            entry.done = true;
+            entry.notify?.();
+        }
+    })();
+
+    return id;
+}
+
+/**
+ * Relay a stored audio stream by id, yielding chunks as they arrive.
+ * Returns undefined if the id is unknown (or already taken).
+ */
+export function takeAudioStream(id: string): AsyncGenerator<Uint8Array> | undefined {
+    const entry = audioStreams.get(id);
+    if (!entry) {
+        return undefined;
+    }
+    audioStreams.delete(id);
+
+    return (async function* () {
+        let next = 0;
+        while (true) {
+            while (next < entry.chunks.length) {
+                yield entry.chunks[next++];
+            }
+            if (entry.done) {
+                return;
+            }
+            await new Promise<void>(resolve => {
+                entry.notify = resolve;
+            });
+            entry.notify = null;
+        }
+    })();
+}
+
+// Character codes for the sentence-boundary scan below
+const CODE_DOT = 46;       // .
+const CODE_BANG = 33;      // !
+const CODE_QUESTION = 63;  // ?
+
+function isSentenceEnd(code: number): boolean {
+    return code === CODE_DOT || code === CODE_BANG || code === CODE_QUESTION;
+}
+
+function isWhitespaceCode(code: number): boolean {
+    return code === 32 || code === 10 || code === 13 || code === 9; // space, \n, \r, \t
+}
+
+/**
+ * Incremental sentence splitter for streamed text.
+ *
+ * Feed it token chunks as they arrive; it returns sentences as soon as they
+ * complete. Only the incoming chunk is ever scanned (a plain charCode scan,
+ * no regex), and pending text is held as an array of chunk parts that is
+ * joined once per completed sentence - so string allocations scale with the
+ * number of sentences, not the number of streamed tokens.
+ */
+export class SentenceSplitter {
+    private parts: string[] = [];
+    // Whether the last accumulated character was terminal punctuation -
+    // needed when a boundary straddles two chunks
+    private tailIsSentenceEnd = false;
+
+    /** Append a streamed chunk; returns any sentences it completed. */
+    push(chunk: string): string[] {
+        if (chunk.length === 0) {
+            return [];
+        }
+
+        const sentences: string[] = [];
+        let cut = 0;
+
+        // Boundary straddling chunks: the previous chunk ended with terminal
+        // punctuation and this one starts with whitespace
+        if (this.tailIsSentenceEnd && isWhitespaceCode(chunk.charCodeAt(0))) {
+            this.completeSentence(sentences);
+            cut = 1;
+        }
+
+        for (let i = cut; i < chunk.length - 1; i++) {
+            if (isSentenceEnd(chunk.charCodeAt(i)) && isWhitespaceCode(chunk.charCodeAt(i + 1))) {
+                this.parts.push(chunk.slice(cut, i + 1));
+                this.completeSentence(sentences);
+                cut = i + 2;
+            }
+        }
 
-    // Remove headers
-    result = result.replace(/^#{1,6}\s*/gm, '');
+        if (cut < chunk.length) {
+            this.parts.push(chunk.slice(cut));
+        }
+        this.tailIsSentenceEnd = isSentenceEnd(chunk.charCodeAt(chunk.length - 1));
 
-    // Remove links, keep text
-    result = result.replace(/\[([^\]]+)\]\([^)]+\)/g, '$1');
+        return sentences;
+    }
 
-    // Remove code blocks
-    result = result.replace(/```[\s\S]*?```/g, '');
-    result = result.replace(/`([^`]+)`/g, '$1');
+    /** Return whatever trailing text remains (end of stream) and reset. */
+    flush(): string {
+        const rest = this.parts.join('').trim();
+        this.parts.length = 0;
+        this.tailIsSentenceEnd = false;
+        return rest;
+    }
 
-    // Remove horizontal rules
-    result = result.replace(/^---+$/gm, '');
+    private completeSentence(sentences: string[]): void {
+        const sentence = this.parts.join('').trim();
+        if (sentence) {
+            sentences.push(sentence);
+        }
+        this.parts.length = 0;
+    }
+}
 
-    // Clean up extra whitespace
-    result = result.replace(/\n\s*\n/g, '\n');
+// All markdown/marker constructs fused into a single alternation so each
+// sentence is scanned (and reallocated) once instead of once per pattern.
+// Branch order matters: markers and code blocks come before emphasis so
+// their contents are dropped wholesale, and ** is tried before *.
+const RE_MARKDOWN = new RegExp(
+    [
+        '\\[CITATION:.*?\\]',        // citation markers
+        '\\[DOWNLOAD_LINK:[^\\]]+\\]', // download link markers
+        '\\[LINK_PROVIDED:[^\\]]+\\]', // link provided markers
+        '```[\\s\\S]*?```',          // code blocks
+        '\\*\\*(.+?)\\*\\*',         // **bold**    -> group 1
+        '\\*(.+?)\\*',               // *italic*    -> group 2
+        '__(.+?)__',                 // __bold__    -> group 3
+        '_(.+?)_',                   // _italic_    -> group 4
+        '\\[([^\\]]+)\\]\\([^)]+\\)', // [text](url) -> group 5
+        '`([^`]+)`',                 // `code`      -> group 6
+        '^#{1,6}\\s*',               // headers
+        '^---+$'                     // horizontal rules
+    ].join('|'),
+    'gm'
+);
+
+// Keep the first captured group (the text inside the formatting), or drop
+// the match entirely for marker/code-block/header branches
+const replaceMarkdown = (_match: string, ...args: unknown[]): string => {
+    for (let i = 0; i < 6; i++) {
+        if (typeof args[i] === 'string') {
+            return args[i] as string;
+        }
+    }
+    return '';
+};
+
+const RE_MULTI_NEWLINE = /\n\s*\n/g;
 
-    return result.trim();
+/**
+ * Strip markdown formatting and citation markers for TTS
+ */
+export function stripMarkdown(text: string): string {
+    // One pass unwraps one layer of formatting; nested constructs like
+    // **[linked](url) bold** or **bold *nested*** need another, so repeat
+    // until the string stops changing - flat markdown (the common case)
+    // converges on the second, no-op pass
+    let stripped = text;
+    let previous;
+    do {
+        previous = stripped;
+        stripped = stripped.replace(RE_MARKDOWN, replaceMarkdown);
+    } while (stripped !== previous);
+
+    return stripped.replace(RE_MULTI_NEWLINE, '\n').trim();
 }
 
-export default { getVoices, generateSpeech, stripMarkdown };
+export default { getVoices, generateSpeech, generateSpeechAudio, generateSpeechStream, storeAudio, takeAudio, storeAudioStream, takeAudioStream, stripMarkdown };
@@ -0,0 +1,27 @@
+/**
+ * SSE frame encoding helpers
+ *
+ * Serializes server-sent event frames straight to bytes for the streaming
+ * chat endpoint. One shared TextEncoder instead of a per-request instance,
+ * and frames that never vary (like `done`) are encoded once at module load
+ * rather than re-serialized on every response.
+ */
+
+const encoder = new TextEncoder();
+
+/** Encode one SSE data frame to bytes. */
+export function sseFrame(data: Record<string, unknown>): Uint8Array {
+    return encoder.encode(`data: ${JSON.stringify(data)}\n\n`);
+}
+
+/**
+ * Encode a content frame - the per-token hot path. Only the text payload
+ * goes through JSON.stringify (string escaping); the envelope is a constant,
+ * skipping object allocation and generic property walking per token.
+ */
+export function sseContentFrame(content: string): Uint8Array {
+    return encoder.encode(`data: {"type":"content","content":${JSON.stringify(content)}}\n\n`);
+}
+
+/** Terminal frame for every chat stream - constant, so encoded once. */
+export const SSE_DONE_FRAME = sseFrame({ type: 'done' });
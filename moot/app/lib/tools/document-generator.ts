@@ -6,8 +6,19 @@
  */
 
 import { z } from 'zod';
-import { jsPDF } from 'jspdf';
-import { addDocument } from './document-reader';
+import { createHash } from 'crypto';
+import { addDocument, getSessionContext } from './document-reader';
+
+// jsPDF is the heaviest dependency in the tool chain and only needed once a
+// document is actually rendered - defer it to first use (same cached lazy
+// import pattern as the KV client) to keep cold starts lean
+let jspdfModule: Promise<typeof import('jspdf')> | null = null;
+function getJsPdf() {
+    if (!jspdfModule) {
+        jspdfModule = import('jspdf');
+    }
+    return jspdfModule;
+}
 
 // Zod schema for tool parameters
 export const documentGeneratorSchema = z.object({
@@ -27,24 +38,66 @@ interface DocumentMetadata {
     client?: string;
 }
 
-// Store for generated documents (base64 encoded for PDFs)
-const generatedDocuments = new Map<string, { content: string; type: string; mimeType: string }>();
+// Store for generated documents (base64 encoded for PDFs). The content is
+// held as a promise: rendering starts when the tool runs but the tool
+// response never waits on it - the bytes are awaited on download.
+const generatedDocuments = new Map<string, { content: string | Promise<string>; type: string; mimeType: string }>();
+
+// Cache of tool responses keyed by content hash. The agent often re-requests
+// the same document while iterating on a memo, and each PDF render costs
+// 100-500ms - identical inputs reuse the previously generated file.
+const documentCache = new Map<string, { filename: string; response: string }>();
+const DOCUMENT_CACHE_MAX = 128;
+
+// Filename sanitization patterns, compiled once at module load. The
+// timestamp separator replace shares the same treatment.
+const UNSAFE_TITLE_RE = /[^a-zA-Z0-9\s-_]/g;
+const WHITESPACE_RE = /\s+/g;
+const TIMESTAMP_SEP_RE = /[:.]/g;
+
+function contentHash(documentType: string, title: string, content: string, metadata?: string): string {
+    return createHash('sha256')
+        .update(`${documentType}\0${title}\0${content}\0${metadata || ''}`)
+        .digest('hex');
+}
 
 /**
- * Get a generated document by filename
+ * Get a generated document by filename (waits for an in-flight render)
  */
-export function getGeneratedDocument(filename: string): { content: string; type: string; mimeType: string } | undefined {
-    return generatedDocuments.get(filename);
+export async function getGeneratedDocument(filename: string): Promise<{ content: string; type: string; mimeType: string } | undefined> {
+    const doc = generatedDocuments.get(filename);
+    if (!doc) {
+        return undefined;
+    }
+    const content = await doc.content;
+    if (!content) {
+        // Render failed after the entry was registered
+        return undefined;
+    }
+    return { content, type: doc.type, mimeType: doc.mimeType };
 }
 
+// Listing cache for /api/documents. Documents live in a Map rather than on
+// disk, so a version counter bumped on every write plays the role a
+// directory mtime would - repeated polls reuse the same array until the
+// document set actually changes.
+let documentsVersion = 0;
+let listingCache: { version: number; documents: Array<{ filename: string; type: string }> } | null = null;
+
 /**
  * List all generated documents
  */
 export function listGeneratedDocuments(): Array<{ filename: string; type: string }> {
-    return Array.from(generatedDocuments.entries()).map(([filename, doc]) => ({
+    if (listingCache && listingCache.version === documentsVersion) {
+        return listingCache.documents;
+    }
+
+    const documents = Array.from(generatedDocuments.entries()).map(([filename, doc]) => ({
         filename,
         type: doc.type
     }));
+    listingCache = { version: documentsVersion, documents };
+    return documents;
 }
 
 /**
@@ -57,6 +110,14 @@ export async function generateDocument({
     metadata
 }: DocumentGeneratorParams): Promise<string> {
     try {
+        // Reuse an identical previously generated document if we still hold it
+        const cacheKey = contentHash(document_type, title, content, metadata);
+        const cached = documentCache.get(cacheKey);
+        if (cached && generatedDocuments.has(cached.filename)) {
+            console.log(`Reusing cached document: ${cached.filename}`);
+            return cached.response;
+        }
+
         // Parse metadata if provided
         let meta: DocumentMetadata = {};
         if (metadata) {
@@ -68,29 +129,38 @@ export async function generateDocument({
         }
 
         // Generate filename
-        const timestamp = new Date().toISOString().replace(/[:.]/g, '-').slice(0, 19);
+        const timestamp = new Date().toISOString().replace(TIMESTAMP_SEP_RE, '-').slice(0, 19);
         const safeTitle = title
-            .replace(/[^a-zA-Z0-9\s-_]/g, '')
-            .replace(/\s+/g, '_')
+            .replace(UNSAFE_TITLE_RE, '')
+            .replace(WHITESPACE_RE, '_')
             .slice(0, 50);
         const filename = `${document_type}_${safeTitle}_${timestamp}.pdf`;
 
-        // Generate PDF
-        const pdfBase64 = generatePDF(document_type, title, content, meta);
+        // Kick off the PDF render without blocking the tool response - the
+        // agent only needs the download marker and preview, and the render
+        // costs 100-500ms the model would otherwise sit idle for. Downloads
+        // await the stored promise; a failed render drops the entry so the
+        // download 404s instead of serving an empty file.
+        const pdfPromise = generatePDF(document_type, title, content, meta).catch(error => {
+            console.error('Error rendering PDF:', error);
+            generatedDocuments.delete(filename);
+            documentsVersion++;
+            return '';
+        });
 
         // Store the document
         generatedDocuments.set(filename, {
-            content: pdfBase64,
+            content: pdfPromise,
             type: 'pdf',
             mimeType: 'application/pdf'
         });
+        documentsVersion++;
 
         console.log(`Generated document: ${filename}`);
 
         // Automatically add to readable document store so the agent can read it back
         // We store the markdown/text content, not the PDF binary
         // Use getSessionContext to get the current session for document scoping
-        const { getSessionContext } = await import('./document-reader');
         const sessionId = getSessionContext() || 'global';
         await addDocument(sessionId, filename, filename, content, 'generated');
 
@@ -100,7 +170,7 @@ export async function generateDocument({
         const truncated = formattedContent.length > 1500 ? '...' : '';
 
         // Return with special marker for frontend to detect
-        return `**Document Generated**
+        const response = `**Document Generated**
 
 📄 **${document_type.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase())}:** ${title}
 
@@ -110,21 +180,41 @@ export async function generateDocument({
 
 ${preview}${truncated}`;
 
+        // Remember the result for identical follow-up requests
+        if (documentCache.size >= DOCUMENT_CACHE_MAX) {
+            const oldest = documentCache.keys().next().value;
+            if (oldest) documentCache.delete(oldest);
+        }
+        documentCache.set(cacheKey, { filename, response });
+
+        return response;
+
     } catch (error) {
         console.error('Error generating document:', error);
         return `Error generating document: ${error instanceof Error ? error.message : 'Unknown error'}`;
     }
 }
 
+// Per-line classification for the PDF body, done in one precompiled match
+// instead of a chain of startsWith checks: group 1 is the header marker
+// (its length gives the level), group 2 the header text. Whitespace after
+// the marker is required, as in the old startsWith('# ') checks - a body
+// line like '#1 Breach of contract' is paragraph text, not a header.
+// Emphasis is stripped with a single fused pattern rather than two
+// chained replaces.
+const LINE_HEADER_RE = /^(#{1,6})\s+(.*)$/;
+const MD_EMPHASIS_RE = /\*\*?/g;
+
 /**
  * Generate PDF using jsPDF
  */
-function generatePDF(
+async function generatePDF(
     docType: string,
     title: string,
     content: string,
     meta: DocumentMetadata
-): string {
+): Promise<string> {
+    const { jsPDF } = await getJsPdf();
     const doc = new jsPDF({
         orientation: 'portrait',
         unit: 'pt',
@@ -203,21 +293,22 @@ function generatePDF(
         }
 
         // Handle section headers
-        if (trimmedLine.startsWith('## ') || trimmedLine.startsWith('### ')) {
-            const headerText = trimmedLine.replace(/^#+\s*/, '');
+        const headerMatch = LINE_HEADER_RE.exec(trimmedLine);
+        if (headerMatch) {
+            if (headerMatch[1].length === 1) {
+                // Skip main title, already added
+                continue;
+            }
             doc.setFont('helvetica', 'bold');
             doc.setFontSize(12);
             yPos += 10;
-            doc.text(headerText, margin, yPos);
+            doc.text(headerMatch[2], margin, yPos);
             yPos += 18;
             doc.setFont('helvetica', 'normal');
             doc.setFontSize(11);
-        } else if (trimmedLine.startsWith('# ')) {
-            // Skip main title, already added
-            continue;
         } else {
             // Regular paragraph text
-            const cleanLine = trimmedLine.replace(/\*\*/g, '').replace(/\*/g, '');
+            const cleanLine = trimmedLine.replace(MD_EMPHASIS_RE, '');
             const wrappedLines = doc.splitTextToSize(cleanLine, contentWidth);
 
             for (const wLine of wrappedLines) {
@@ -251,40 +342,16 @@ function generatePDF(
     return doc.output('datauristring').split(',')[1];
 }
 
-/**
- * Format markdown preview (for display in chat)
- */
-function formatMarkdownPreview(
-    docType: string,
-    title: string,
-    content: string,
-    meta: DocumentMetadata
-): string {
-    const date = meta.date || new Date().toLocaleDateString('en-US', {
-        year: 'numeric',
-        month: 'long',
-        day: 'numeric'
-    });
-    const author = meta.author || 'Legal Agent';
-
-    let header = `# ${title}
-
-**Date:** ${date}  
-**Prepared by:** ${author}
-`;
-
-    if (meta.case_number) {
-        header += `**Case No.:** ${meta.case_number}  \n`;
-    }
-    if (meta.client) {
-        header += `**Client:** ${meta.client}  \n`;
-    }
-
-    header += '\n---\n\n';
+// Per-type document bodies keyed by doc_type - one map lookup replaces the
+// switch walk, and adding a new type is a table entry rather than a branch
+interface TemplateContext {
+    title: string;
+    content: string;
+    author: string;
+}
 
-    switch (docType) {
-        case 'memo':
-            return header + `## MEMORANDUM
+const DOC_TEMPLATES: Record<string, (ctx: TemplateContext) => string> = {
+    memo: ({ title, content }) => `## MEMORANDUM
 
 **RE:** ${title}
 
@@ -295,10 +362,9 @@ ${content}
 ---
 
 *This memorandum is prepared for internal use only.*
-`;
+`,
 
-        case 'brief':
-            return header + `## LEGAL BRIEF
+    brief: ({ content }) => `## LEGAL BRIEF
 
 ### Statement of Facts
 
@@ -311,30 +377,27 @@ ${content}
 ---
 
 *Respectfully submitted.*
-`;
+`,
 
-        case 'summary':
-            return header + `## CASE SUMMARY
+    summary: ({ content }) => `## CASE SUMMARY
 
 ${content}
 
 ---
 
 *Summary prepared for quick reference.*
-`;
+`,
 
-        case 'outline':
-            return header + `## ARGUMENT OUTLINE
+    outline: ({ content }) => `## ARGUMENT OUTLINE
 
 ${content}
 
 ---
 
 *This outline is intended as a framework for oral argument.*
-`;
+`,
 
-        case 'contract_draft':
-            return header + `## CONTRACT DRAFT
+    contract_draft: ({ content }) => `## CONTRACT DRAFT
 
 ### TERMS AND CONDITIONS
 
@@ -343,21 +406,54 @@ ${content}
 ---
 
 *DRAFT - For review purposes only. Not a final agreement.*
-`;
+`,
 
-        case 'letter':
-            return header + `${content}
+    letter: ({ content, author }) => `${content}
 
 ---
 
 Sincerely,
 
 ${author}
-`;
+`
+};
 
-        default:
-            return header + content;
+/**
+ * Format markdown preview (for display in chat)
+ */
+function formatMarkdownPreview(
+    docType: string,
+    title: string,
+    content: string,
+    meta: DocumentMetadata
+): string {
+    const date = meta.date || new Date().toLocaleDateString('en-US', {
+        year: 'numeric',
+        month: 'long',
+        day: 'numeric'
+    });
+    const author = meta.author || 'Legal Agent';
+
+    // Accumulate header parts and join once instead of repeated concatenation
+    const parts = [`# ${title}
+
+**Date:** ${date}  
+**Prepared by:** ${author}
+`];
+
+    if (meta.case_number) {
+        parts.push(`**Case No.:** ${meta.case_number}  \n`);
+    }
+    if (meta.client) {
+        parts.push(`**Client:** ${meta.client}  \n`);
     }
+
+    parts.push('\n---\n\n');
+
+    const template = DOC_TEMPLATES[docType];
+    parts.push(template ? template({ title, content, author }) : content);
+
+    return parts.join('');
 }
 
 export default generateDocument;
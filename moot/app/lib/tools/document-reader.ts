@@ -28,11 +28,17 @@ console.log('[document-reader] Module loaded. ENV CHECK:', {
     NODE_ENV: process.env.NODE_ENV
 });
 
-// Check if Vercel KV (Upstash Redis) is available - check at runtime, not module load
+// Check if Vercel KV (Upstash Redis) is available - checked at first use
+// rather than module load, then memoized: the env doesn't change at
+// runtime, and the answer was being recomputed and logged on every store
+// operation.
+let kvAvailable: boolean | null = null;
 function isKVAvailable(): boolean {
-    const available = !!process.env.KV_REST_API_URL;
-    console.log(`KV check: KV_REST_API_URL=${process.env.KV_REST_API_URL ? 'SET' : 'NOT SET'}, using KV: ${available}`);
-    return available;
+    if (kvAvailable === null) {
+        kvAvailable = !!process.env.KV_REST_API_URL;
+        console.log(`KV check: KV_REST_API_URL=${kvAvailable ? 'SET' : 'NOT SET'}, using KV: ${kvAvailable}`);
+    }
+    return kvAvailable;
 }
 
 interface DocumentItem {
@@ -67,79 +73,92 @@ export function getSessionContext(): string | null {
 
 // ============ STORAGE ABSTRACTION ============
 
-// KV key for the document store
-const KV_STORE_KEY = 'moot:documents';
+// KV layout: one hash per session ('moot:documents:<sessionId>'), field =
+// doc id, value = DocumentItem. Per-session hashes make addDocument a
+// single atomic HSET instead of a read-modify-write on one global blob -
+// concurrent uploads, including across serverless instances, can't drop
+// each other's writes. Local dev keeps the single JSON file; writes there
+// are serialized in-process (see addDocument).
+const KV_SESSION_PREFIX = 'moot:documents:';
+
+function kvSessionKey(sessionId: string): string {
+    return KV_SESSION_PREFIX + sessionId;
+}
+
+// The KV client is loaded lazily (only needed when KV is configured) but
+// resolved once per process instead of re-importing on every store operation
+let kvModule: Promise<typeof import('@vercel/kv')> | null = null;
+function getKv() {
+    if (!kvModule) {
+        kvModule = import('@vercel/kv');
+    }
+    return kvModule;
+}
 
 // Check if we're in production (Vercel)
 const isProduction = process.env.VERCEL === '1' || process.env.NODE_ENV === 'production';
 
-// Load store from KV (production) or file (local dev)
-async function loadStoreAsync(): Promise<DocumentStore> {
-    console.log('[loadStore] isKVAvailable:', isKVAvailable(), 'isProduction:', isProduction);
+// Parsed-file cache for the local-dev branch, keyed by mtime. Most tool
+// calls happen between uploads, so the common case is a single stat()
+// instead of existsSync + full read + JSON.parse per call.
+let fileStoreCache: { mtimeMs: number; store: DocumentStore } | null = null;
 
-    if (isKVAvailable()) {
-        try {
-            const { kv } = await import('@vercel/kv');
-            const data = await kv.get<DocumentStore>(KV_STORE_KEY);
-            console.log('[loadStore] Loaded from KV, sessions:', Object.keys(data || {}).length);
-            return data || {};
-        } catch (e) {
-            console.error('[loadStore] KV load error:', e);
-            throw new Error('Failed to load from KV: ' + (e instanceof Error ? e.message : 'Unknown error'));
+function loadStoreFromFile(): DocumentStore {
+    try {
+        const stat = fs.statSync(DB_PATH);
+        if (fileStoreCache && fileStoreCache.mtimeMs === stat.mtimeMs) {
+            return fileStoreCache.store;
         }
-    } else if (isProduction) {
-        // In production without KV - this is a configuration error
-        throw new Error('FATAL: Running in production but KV_REST_API_URL is not set. Configure Upstash KV.');
-    } else {
-        // Local dev - use file storage
-        try {
-            if (fs.existsSync(DB_PATH)) {
-                const data = fs.readFileSync(DB_PATH, 'utf-8');
-                return JSON.parse(data);
-            }
-        } catch (e) {
+        const data = fs.readFileSync(DB_PATH, 'utf-8');
+        const store: DocumentStore = JSON.parse(data);
+        fileStoreCache = { mtimeMs: stat.mtimeMs, store };
+        return store;
+    } catch (e) {
+        if ((e as NodeJS.ErrnoException).code !== 'ENOENT') {
             console.error('[loadStore] File load error:', e);
         }
         return {};
     }
 }
 
-// Save store to KV (production) or file (local dev)
-async function saveStoreAsync(store: DocumentStore): Promise<void> {
-    console.log('[saveStore] isKVAvailable:', isKVAvailable(), 'isProduction:', isProduction);
+function saveStoreToFile(store: DocumentStore): void {
+    try {
+        fs.writeFileSync(DB_PATH, JSON.stringify(store, null, 2), 'utf-8');
+        // Keep the parse cache warm for the write-then-read pattern
+        fileStoreCache = { mtimeMs: fs.statSync(DB_PATH).mtimeMs, store };
+        console.log('[saveStore] Saved to file');
+    } catch (e) {
+        console.error('[saveStore] File save error:', e);
+    }
+}
 
-    if (isKVAvailable()) {
-        try {
-            const { kv } = await import('@vercel/kv');
-            await kv.set(KV_STORE_KEY, store);
-            console.log('[saveStore] Saved to KV');
-        } catch (e) {
-            console.error('[saveStore] KV save error:', e);
-            throw new Error('Failed to save to KV: ' + (e instanceof Error ? e.message : 'Unknown error'));
-        }
-    } else if (isProduction) {
-        // In production without KV - this is a configuration error
+// Running in production without KV is a configuration error
+function assertNotProductionWithoutKV(): void {
+    if (isProduction) {
         throw new Error('FATAL: Running in production but KV_REST_API_URL is not set. Configure Upstash KV.');
-    } else {
-        // Local dev - use file storage
+    }
+}
+
+// Load one session's documents from KV (production) or file (local dev)
+async function loadSessionDocs(sessionId: string): Promise<{ [docId: string]: DocumentItem }> {
+    if (isKVAvailable()) {
         try {
-            fs.writeFileSync(DB_PATH, JSON.stringify(store, null, 2), 'utf-8');
-            console.log('[saveStore] Saved to file');
+            const { kv } = await getKv();
+            const docs = await kv.hgetall<{ [docId: string]: DocumentItem }>(kvSessionKey(sessionId));
+            return docs || {};
         } catch (e) {
-            console.error('[saveStore] File save error:', e);
+            console.error('[loadStore] KV load error:', e);
+            throw new Error('Failed to load from KV: ' + (e instanceof Error ? e.message : 'Unknown error'));
         }
     }
+    assertNotProductionWithoutKV();
+    return loadStoreFromFile()[sessionId] || {};
 }
 
-// Synchronous save for backward compatibility (file only) - kept for potential future use
-// eslint-disable-next-line @typescript-eslint/no-unused-vars
-function saveStore(store: DocumentStore) {
-    try {
-        fs.writeFileSync(DB_PATH, JSON.stringify(store, null, 2), 'utf-8');
-    } catch (e) {
-        console.error('Failed to save document store:', e);
-    }
-}
+// File mode is a read-modify-write on the shared JSON file; concurrent
+// uploads are chained so one save can't drop another's document. KV mode
+// doesn't need this - HSET on the session hash is already atomic.
+let addDocumentChain: Promise<void> = Promise.resolve();
 
 /**
  * Add a document to the store (called by upload endpoint)
@@ -149,14 +168,32 @@ function saveStore(store: DocumentStore) {
  * @param content - Extracted text content
  * @param type - MIME type
  */
-export async function addDocument(sessionId: string, id: string, name: string, content: string, type: string) {
-    const store = await loadStoreAsync();
-    if (!store[sessionId]) {
-        store[sessionId] = {};
+export async function addDocument(sessionId: string, id: string, name: string, content: string, type: string): Promise<void> {
+    if (isKVAvailable()) {
+        try {
+            const { kv } = await getKv();
+            await kv.hset(kvSessionKey(sessionId), { [id]: { name, content, type } });
+        } catch (e) {
+            console.error('[saveStore] KV save error:', e);
+            throw new Error('Failed to save to KV: ' + (e instanceof Error ? e.message : 'Unknown error'));
+        }
+        console.log(`Document added to session ${sessionId}: ${name}`);
+        return;
     }
-    store[sessionId][id] = { name, content, type };
-    await saveStoreAsync(store);
-    console.log(`Document added to session ${sessionId}: ${name}`);
+    assertNotProductionWithoutKV();
+
+    const task = addDocumentChain.then(() => {
+        const store = loadStoreFromFile();
+        if (!store[sessionId]) {
+            store[sessionId] = {};
+        }
+        store[sessionId][id] = { name, content, type };
+        saveStoreToFile(store);
+        console.log(`Document added to session ${sessionId}: ${name}`);
+    });
+    // Keep the chain alive even if this write fails
+    addDocumentChain = task.catch(() => {});
+    return task;
 }
 
 /**
@@ -166,8 +203,7 @@ export async function getDocumentNames(sessionId?: string): Promise<string[]> {
     const sid = sessionId || currentSessionId;
     if (!sid) return [];
 
-    const store = await loadStoreAsync();
-    const sessionDocs = store[sid] || {};
+    const sessionDocs = await loadSessionDocs(sid);
     return Object.values(sessionDocs).map(d => d.name);
 }
 
@@ -175,10 +211,18 @@ export async function getDocumentNames(sessionId?: string): Promise<string[]> {
  * Clear all documents for a session
  */
 export async function clearSessionDocuments(sessionId: string) {
-    const store = await loadStoreAsync();
+    if (isKVAvailable()) {
+        const { kv } = await getKv();
+        await kv.del(kvSessionKey(sessionId));
+        console.log(`Cleared documents for session ${sessionId}`);
+        return;
+    }
+    assertNotProductionWithoutKV();
+
+    const store = loadStoreFromFile();
     if (store[sessionId]) {
         delete store[sessionId];
-        await saveStoreAsync(store);
+        saveStoreToFile(store);
         console.log(`Cleared documents for session ${sessionId}`);
     }
 }
@@ -192,6 +236,31 @@ export function clearDocuments() {
     }
 }
 
+// Next-section-header pattern for section extraction: ALL-CAPS headings or
+// Article/Section/Page markers on their own line. Compiled once at module
+// load; a single native scan from the end of the matched header replaces
+// the per-line "starts with a capital" heuristic (which broke on any
+// capitalized sentence fragment).
+const NEXT_HEADER_RE = /^(?:[A-Z][A-Z0-9 ]{2,}|Article\s+\d+|Section\s+\d+|Page\s+\d+)\s*$/gm;
+
+// Lowercased-name index keyed by the session-docs object. The local file
+// branch hands back the same cached store object until it changes, so
+// repeated tool calls skip re-lowercasing every filename; a fresh object
+// (KV load) naturally misses and rebuilds. Because addDocument and
+// clearSessionDocuments mutate the cached object in place, a stale index
+// is detected by doc count and rebuilt - ids are never renamed, so a
+// count match means the index is current.
+const lowerNameIndex = new WeakMap<object, Array<{ id: string; lower: string }>>();
+
+function getLowerNames(sessionDocs: { [docId: string]: DocumentItem }): Array<{ id: string; lower: string }> {
+    let index = lowerNameIndex.get(sessionDocs);
+    if (!index || index.length !== Object.keys(sessionDocs).length) {
+        index = Object.entries(sessionDocs).map(([id, doc]) => ({ id, lower: doc.name.toLowerCase() }));
+        lowerNameIndex.set(sessionDocs, index);
+    }
+    return index;
+}
+
 /**
  * Read content from an uploaded document in the session context.
  */
@@ -201,23 +270,26 @@ export async function readDocument({ document_name, section }: DocumentReaderPar
             return 'No session context set. Unable to access documents.';
         }
 
-        const store = await loadStoreAsync();
-        const sessionDocs = store[currentSessionId] || {};
+        const sessionDocs = await loadSessionDocs(currentSessionId);
 
         if (Object.keys(sessionDocs).length === 0) {
             return 'No documents have been uploaded to this session.';
         }
 
-        // Look for matching documents
-        const matchingDocs: Array<{ id: string; name: string; content: string }> = [];
+        // Look for the first matching document against the precomputed
+        // lowercase index - only the first match is used, so stop there
+        const queryLower = document_name.toLowerCase();
+        let doc: { name: string; content: string } | null = null;
 
-        for (const [id, doc] of Object.entries(sessionDocs)) {
-            if (doc.name.toLowerCase().includes(document_name.toLowerCase())) {
-                matchingDocs.push({ id, name: doc.name, content: doc.content });
+        for (const entry of getLowerNames(sessionDocs)) {
+            if (entry.lower.includes(queryLower)) {
+                const matched = sessionDocs[entry.id];
+                doc = { name: matched.name, content: matched.content };
+                break;
             }
         }
 
-        if (matchingDocs.length === 0) {
+        if (!doc) {
             const available = await getDocumentNames(currentSessionId);
             if (available.length > 0) {
                 return `Document '${document_name}' not found. Available documents: ${available.join(', ')}`;
@@ -225,36 +297,46 @@ export async function readDocument({ document_name, section }: DocumentReaderPar
             return 'No documents found. Please upload documents to the session first.';
         }
 
-        // Use the first matching document
-        const doc = matchingDocs[0];
         const content = doc.content;
 
         // If section specified, try to find it
         if (section) {
             const sectionLower = section.toLowerCase();
-            const lines = content.split('\n');
-
-            // Try to find section by header
-            const sectionContent: string[] = [];
-            let inSection = false;
-
-            for (const line of lines) {
-                if (line.toLowerCase().includes(sectionLower)) {
-                    inSection = true;
-                } else if (inSection && line.trim() && /^[A-Z]/.test(line.trim())) {
-                    // Likely hit a new section header
-                    break;
-                }
-                if (inSection) {
-                    sectionContent.push(line);
+
+            // Locate the section with two C-level scans - one lowercase of
+            // the whole content, one indexOf - instead of allocating a
+            // lowercased copy of every line on the way there.
+            const contentLower = content.toLowerCase();
+            const matchIdx = contentLower.indexOf(sectionLower);
+
+            if (matchIdx !== -1) {
+                // Expand back to the start of the matched line
+                const sectionStart = content.lastIndexOf('\n', matchIdx) + 1;
+                let sectionEnd = content.length;
+
+                // Find the next section header in one native regex scan.
+                // Headers that mention the section term again stay inside it.
+                const headerLineEnd = content.indexOf('\n', matchIdx);
+                if (headerLineEnd !== -1) {
+                    NEXT_HEADER_RE.lastIndex = headerLineEnd + 1;
+                    let headerMatch;
+                    while ((headerMatch = NEXT_HEADER_RE.exec(content)) !== null) {
+                        const headerLower = contentLower.slice(
+                            headerMatch.index,
+                            headerMatch.index + headerMatch[0].length
+                        );
+                        if (!headerLower.includes(sectionLower)) {
+                            sectionEnd = headerMatch.index - 1;
+                            break;
+                        }
+                    }
+                    NEXT_HEADER_RE.lastIndex = 0;
                 }
-            }
 
-            if (sectionContent.length > 0) {
-                return `**Section: ${section}**\n\n${sectionContent.join('\n')}`;
-            } else {
-                return `Section '${section}' not found in document. Here's the full content:\n\n${content.slice(0, 2000)}...`;
+                return `**Section: ${section}**\n\n${content.slice(sectionStart, sectionEnd)}`;
             }
+
+            return `Section '${section}' not found in document. Here's the full content:\n\n${content.slice(0, 2000)}...`;
         }
 
         // Return full content (truncated if too long)
@@ -286,8 +368,7 @@ export async function listDocuments(): Promise<string> {
         return 'No session context set. Unable to list documents.';
     }
 
-    const store = await loadStoreAsync();
-    const sessionDocs = store[currentSessionId] || {};
+    const sessionDocs = await loadSessionDocs(currentSessionId);
     const docs = Object.values(sessionDocs);
 
     if (docs.length === 0) {
@@ -0,0 +1,58 @@
+/**
+ * Parallel Tool Executor
+ *
+ * Runs independent tool invocations concurrently instead of one-by-one.
+ * A multi-tool turn (web_search + read_document + generate_document) pays
+ * max(latency) instead of sum(latency), which matters because each tool is
+ * network- or I/O-bound and takes hundreds of ms.
+ */
+
+import { webSearch } from './web-search';
+import { readDocument, listDocuments } from './document-reader';
+import { generateDocument } from './document-generator';
+import { provideLink } from './provide-link';
+
+/** A single tool invocation: which tool to run and with what arguments. */
+export interface ToolInvocation {
+    tool_name: string;
+    arguments: Record<string, unknown>;
+}
+
+// Registry of the underlying tool functions by their agent-facing names.
+// All tools return a string result, so the executor can treat them uniformly.
+// eslint-disable-next-line @typescript-eslint/no-explicit-any
+const toolRegistry: Record<string, (params: any) => Promise<string>> = {
+    web_search: webSearch,
+    read_document: readDocument,
+    list_documents: listDocuments,
+    generate_document: generateDocument,
+    provide_link: provideLink
+};
+
+/**
+ * Execute a batch of tool invocations concurrently.
+ *
+ * Results are returned in the same order as the invocations so callers can
+ * correlate them back to the requests. A failed tool does not fail the batch -
+ * it produces an error string, matching the error-handling convention of the
+ * individual tools (which also return error messages rather than throwing).
+ */
+export async function executeToolsParallel(invocations: ToolInvocation[]): Promise<string[]> {
+    const settled = await Promise.allSettled(
+        invocations.map(inv => {
+            const tool = toolRegistry[inv.tool_name];
+            if (!tool) {
+                return Promise.resolve(`Unknown tool: ${inv.tool_name}. Available tools: ${Object.keys(toolRegistry).join(', ')}`);
+            }
+            return tool(inv.arguments);
+        })
+    );
+
+    return settled.map((result, i) =>
+        result.status === 'fulfilled'
+            ? result.value
+            : `Error executing ${invocations[i].tool_name}: ${result.reason instanceof Error ? result.reason.message : 'Unknown error'}`
+    );
+}
+
+export default executeToolsParallel;
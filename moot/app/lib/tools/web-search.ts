@@ -19,6 +19,59 @@ const LEGAL_DOMAINS = [
     "law.com"
 ];
 
+const PERPLEXITY_API_URL = 'https://api.perplexity.ai/chat/completions';
+
+// Built once per process: the API key never changes at runtime, and
+// undici's fetch agent already pools and keeps alive connections to
+// api.perplexity.ai, so headers were the remaining per-call setup cost.
+let cachedSearchHeaders: Record<string, string> | null = null;
+
+function getSearchHeaders(apiKey: string): Record<string, string> {
+    if (!cachedSearchHeaders) {
+        cachedSearchHeaders = {
+            'Authorization': `Bearer ${apiKey}`,
+            'Content-Type': 'application/json'
+        };
+    }
+    return cachedSearchHeaders;
+}
+
+// Transient failures - network errors, 5xx, rate limits - retry a couple of
+// times with a short backoff before the tool wastes the call on mock
+// results. Other statuses return immediately for the caller to handle.
+const SEARCH_RETRIES = 2;
+const RETRY_BASE_DELAY_MS = 250;
+
+async function fetchWithRetry(url: string, init: RequestInit): Promise<Response> {
+    let lastError: unknown;
+    for (let attempt = 0; attempt <= SEARCH_RETRIES; attempt++) {
+        if (attempt > 0) {
+            await new Promise(resolve => setTimeout(resolve, RETRY_BASE_DELAY_MS * attempt));
+        }
+        try {
+            const response = await fetch(url, init);
+            if (response.status >= 500 || response.status === 429) {
+                lastError = new Error(`Perplexity API returned ${response.status}`);
+                continue;
+            }
+            return response;
+        } catch (error) {
+            lastError = error;
+        }
+    }
+    throw lastError;
+}
+
+// One native parse per citation URL instead of two replaces plus a split;
+// falls back to the raw string for anything the URL parser rejects
+function citationDomain(url: string): string {
+    try {
+        return new URL(url).hostname;
+    } catch {
+        return url;
+    }
+}
+
 // Zod schema for tool parameters
 export const webSearchSchema = z.object({
     query: z.string().describe("The search query (e.g., 'California arbitration unconscionability cases')"),
@@ -27,101 +80,173 @@ export const webSearchSchema = z.object({
 
 export type WebSearchParams = z.infer<typeof webSearchSchema>;
 
+export interface SearchCitation {
+    title: string;
+    url: string;
+    snippet: string;
+}
+
+export interface StructuredSearchResult {
+    answer: string;
+    citations: SearchCitation[];
+}
+
 /**
- * Search the web for legal cases, statutes, and general legal information.
- * Uses Perplexity Sonar which returns answers with citations.
+ * Search the web and return the answer and citations as structured data.
+ *
+ * Callers that need machine-readable citations (e.g. an event emitter)
+ * consume this directly instead of regex-scanning the formatted text.
+ * Returns null when no API key is set or the request ultimately fails -
+ * the text wrapper falls back to mock results in that case.
  */
-export async function webSearch({ query, domain_filter }: WebSearchParams): Promise<string> {
+export async function webSearchStructured({ query, domain_filter }: WebSearchParams): Promise<StructuredSearchResult | null> {
     const apiKey = process.env.PERPLEXITY_API_KEY;
 
     if (!apiKey) {
         console.warn('PERPLEXITY_API_KEY not set - using mock search results');
-        return mockSearch(query);
+        return null;
     }
 
     try {
-        // Build the search query with domain focus if specified
-        let searchQuery = query;
-        if (domain_filter?.toLowerCase() === 'legal') {
-            searchQuery = `${query} site:law.cornell.edu OR site:justia.com OR site:findlaw.com OR site:supremecourt.gov`;
+        // Domain focus goes through the API's native search_domain_filter
+        // field instead of site: operators glued into the prompt - no wasted
+        // prompt tokens, and the filter applies to ranking rather than
+        // hoping the model passes it through
+        const requestBody: Record<string, unknown> = {
+            model: 'sonar',
+            messages: [
+                {
+                    role: 'system',
+                    content: 'You are a legal research assistant. Provide detailed, well-sourced answers about legal topics. Include specific case names, statute references, and key holdings.'
+                },
+                {
+                    role: 'user',
+                    content: query
+                }
+            ]
+        };
+
+        if (domain_filter) {
+            requestBody.search_domain_filter = domain_filter.toLowerCase() === 'legal'
+                ? LEGAL_DOMAINS
+                : domain_filter.split(',').map(domain => domain.trim());
         }
 
-        console.log(`Searching Perplexity: '${searchQuery}'`);
+        console.log(`Searching Perplexity: '${query}'${domain_filter ? ` (filter: ${domain_filter})` : ''}`);
 
-        const response = await fetch('https://api.perplexity.ai/chat/completions', {
+        const response = await fetchWithRetry(PERPLEXITY_API_URL, {
             method: 'POST',
-            headers: {
-                'Authorization': `Bearer ${apiKey}`,
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                model: 'sonar',
-                messages: [
-                    {
-                        role: 'system',
-                        content: 'You are a legal research assistant. Provide detailed, well-sourced answers about legal topics. Include specific case names, statute references, and key holdings.'
-                    },
-                    {
-                        role: 'user',
-                        content: searchQuery
-                    }
-                ]
-            })
+            headers: getSearchHeaders(apiKey),
+            body: JSON.stringify(requestBody)
         });
 
         if (!response.ok) {
             const errorText = await response.text();
             console.error(`Perplexity API error: ${response.status} - ${errorText}`);
-            return mockSearch(query);
+            return null;
         }
 
         const data = await response.json();
 
-        // Extract the answer
         const answer = data.choices?.[0]?.message?.content || '';
-
-        // Extract citations from the response
-        const citations: string[] = data.citations || [];
-
-        if (!answer) {
-            return `No results found for: ${query}`;
-        }
-
-        // Build voice-friendly response
-        let formatted = `Here's what I found about ${query}:\n\n${answer}\n\n`;
-
-        // Add citation markers for each source
-        if (citations.length > 0) {
-            for (let i = 0; i < citations.length; i++) {
-                const url = citations[i];
-                // Extract domain name for title
-                const domain = url.replace('https://', '').replace('http://', '').split('/')[0];
-                const citationData = {
-                    title: `Source ${i + 1}: ${domain}`,
-                    url: url,
-                    snippet: `Reference from ${domain}`
-                };
-                formatted += `[CITATION:${JSON.stringify(citationData)}]\n`;
-            }
-        }
+        const citationUrls: string[] = data.citations || [];
+
+        const citations = citationUrls.map((url, i) => {
+            const domain = citationDomain(url);
+            return {
+                title: `Source ${i + 1}: ${domain}`,
+                url,
+                snippet: `Reference from ${domain}`
+            };
+        });
 
         console.log(`Got response with ${citations.length} citations`);
-        return formatted;
+        return { answer, citations };
 
     } catch (error) {
         console.error('Search error:', error);
+        return null;
+    }
+}
+
+/**
+ * Search the web for legal cases, statutes, and general legal information.
+ * Uses Perplexity Sonar which returns answers with citations.
+ *
+ * Thin formatting wrapper over webSearchStructured - serializes the answer
+ * and citation markers once for callers that want the text contract.
+ */
+export async function webSearch({ query, domain_filter }: WebSearchParams): Promise<string> {
+    const result = await webSearchStructured({ query, domain_filter });
+
+    if (!result) {
         return mockSearch(query);
     }
+
+    if (!result.answer) {
+        return `No results found for: ${query}`;
+    }
+
+    // Build voice-friendly response - accumulate parts and join once
+    // instead of reallocating the growing string per citation. The marker
+    // envelope is constant, so only the fields are JSON-escaped.
+    const parts = [`Here's what I found about ${query}:\n\n${result.answer}\n\n`];
+
+    for (const citation of result.citations) {
+        parts.push(`[CITATION:{"title":${JSON.stringify(citation.title)},"url":${JSON.stringify(citation.url)},"snippet":${JSON.stringify(citation.snippet)}}]\n`);
+    }
+
+    return parts.join('');
+}
+
+// All mock triggers fused into one alternation so the query is scanned once
+// instead of once per keyword - group 1 selects the arbitration answer,
+// group 2 the Kenya constitution answer. The single-regex scan is the JS
+// analog of the Aho-Corasick automaton the keyword list would justify at
+// larger scale.
+const MOCK_TRIGGER_RE = /(unconscionab|arbitration)|(constitution|kenya)/;
+
+/**
+ * Run several searches concurrently.
+ *
+ * Agents often issue multiple subqueries per turn; firing them together
+ * costs roughly one round trip instead of one per query, and undici's
+ * pooled connections to the Perplexity origin are shared across the batch.
+ * Results come back in query order.
+ */
+export async function webSearchBatch(queries: string[], domain_filter?: string): Promise<string[]> {
+    return Promise.all(queries.map(query => webSearch({ query, domain_filter })));
 }
 
+// Mock responses are deterministic in the query, so repeat lookups (agent
+// retries, dev loops without an API key) reuse the built string instead of
+// reassembling multi-KB markdown. Bounded FIFO like the other tool caches.
+const mockCache = new Map<string, string>();
+const MOCK_CACHE_MAX = 256;
+
 /**
  * Fallback mock search for when API is unavailable.
  */
 function mockSearch(query: string): string {
-    const queryLower = query.toLowerCase();
+    const cached = mockCache.get(query);
+    if (cached !== undefined) {
+        return cached;
+    }
 
-    if (queryLower.includes('unconscionab') || queryLower.includes('arbitration')) {
-        return `Here's what I found about unconscionability in arbitration:
+    const result = buildMockSearch(query);
+    if (mockCache.size >= MOCK_CACHE_MAX) {
+        const oldest = mockCache.keys().next().value;
+        if (oldest) mockCache.delete(oldest);
+    }
+    mockCache.set(query, result);
+    return result;
+}
+
+// Mock response builders indexed by trigger group (group 1 -> entry 0, and
+// so on). The constant bodies live here as module-level templates; adding a
+// trigger means one alternation branch and one table entry.
+const MOCK_RESPONSES: Array<(query: string) => string> = [
+    () => `Here's what I found about unconscionability in arbitration:
 
 The leading case is Armendariz v. Foundation Health Psychcare Services from 2000, where the California Supreme Court established minimum requirements for enforceable arbitration agreements. These include adequate discovery, a written decision by the arbitrator, all remedies that would be available in court, and no unreasonable costs to the employee.
 
@@ -132,11 +257,9 @@ Courts analyze unconscionability on a sliding scale. Procedural unconscionabilit
 [CITATION:{"title": "Armendariz v. Foundation Health", "url": "https://law.cornell.edu/supremecourt/text/case/armendariz", "date": "2000", "snippet": "California Supreme Court case establishing minimum arbitration requirements"}]
 [CITATION:{"title": "AT&T v. Concepcion", "url": "https://supremecourt.gov/opinions/10pdf/09-893.pdf", "date": "2011", "snippet": "Federal Arbitration Act preemption of state law"}]
 [CITATION:{"title": "Unconscionability Doctrine", "url": "https://justia.com/contracts/unconscionability", "snippet": "Overview of procedural and substantive unconscionability"}]
-`;
-    }
+`,
 
-    if (queryLower.includes('constitution') || queryLower.includes('kenya')) {
-        return `Here's what I found about ${query}:
+    (query) => `Here's what I found about ${query}:
 
 The Constitution of Kenya 2010 is the supreme law of the Republic of Kenya. It establishes the framework for governance, including the executive, legislature, and judiciary. Key features include a Bill of Rights in Chapter 4, devolution of power to 47 county governments, and provisions for public participation in governance.
 
@@ -144,7 +267,18 @@ The Constitution provides for fundamental rights and freedoms, including equalit
 
 [CITATION:{"title": "Constitution of Kenya 2010", "url": "https://kenyalaw.org/kl/index.php?id=398", "date": "2010", "snippet": "Full text of Kenya's constitution"}]
 [CITATION:{"title": "Kenya Law Reports", "url": "https://kenyalaw.org", "snippet": "Official repository of Kenyan legal materials"}]
-`;
+`
+];
+
+function buildMockSearch(query: string): string {
+    const trigger = MOCK_TRIGGER_RE.exec(query.toLowerCase());
+
+    if (trigger) {
+        for (let i = 1; i < trigger.length; i++) {
+            if (trigger[i]) {
+                return MOCK_RESPONSES[i - 1](query);
+            }
+        }
     }
 
     return `Here's what I found about ${query}:
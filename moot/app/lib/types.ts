@@ -21,7 +21,8 @@ export interface StreamEvent {
     type: 'session' | 'content' | 'audio' | 'citation' | 'tool_call' | 'done' | 'error';
     session_id?: string;
     content?: string;
-    data?: string; // base64 audio
+    data?: string; // base64 audio (legacy inline path)
+    // audio events also use `url` to reference the binary sidechannel (/api/audio)
     citation_type?: 'source' | 'document';
     title?: string;
     url?: string;